@@ -5,42 +5,163 @@
 输出 JSON: { "images": [{ "data": "base64...", "media_type": "image/jpeg" }, ...] }
 策略：先尝试降质量，再尝试缩小尺寸，逐步压缩直到总大小合规。
 """
-import sys, json, base64, io
+import sys, json, binascii, io, os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 
+# 可选加速：mozjpeg 无损优化（渐进式 + trellis + 优化 Huffman 表），
+# 同等质量下输出约小 13%，未安装时自动退回 Pillow 默认编码
+try:
+    import mozjpeg_lossless_optimization
+except ImportError:
+    mozjpeg_lossless_optimization = None
+
+# 可选加速：orjson（SIMD JSON），对内嵌 MB 级 base64 的载荷快 3-10 倍
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_json(raw):
+    """从字节串解析 JSON"""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def dump_json(obj):
+    """序列化 JSON 写到 stdout"""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj))
+    else:
+        json.dump(obj, sys.stdout)
+
+
+# mozjpeg 可用时基线已小约 13%，质量阶梯可以更稀疏
+QUALITY_STEPS = [85, 55, 30] if mozjpeg_lossless_optimization else [85, 60, 40, 25]
+SCALE_STEPS = [1.0, 0.75, 0.5, 0.35, 0.25]
+
+
+def b64_str(raw):
+    """编码为 base64 str（binascii 的 C 实现，免去 base64 模块的包装开销）"""
+    # JSON 序列化要求 str，这里的 decode 是唯一一次拷贝
+    return binascii.b2a_base64(raw, newline=False).decode('ascii')
+
+
+def estimate_size(w, h, scale, quality):
+    """粗略估算 JPEG 输出字节数（仅用于候选排序，无需精确）"""
+    return (w * scale) * (h * scale) * 0.15 * quality / 85
+
+
+def encode_jpeg(img, quality, buf=None):
+    """编码为 JPEG 字节串，可用时经 mozjpeg 无损优化。
+
+    buf 可跨多次编码复用（seek+truncate 清空），避免每次尝试都新分配 BytesIO。
+    """
+    if buf is None:
+        buf = io.BytesIO()
+    else:
+        buf.seek(0)
+        buf.truncate()
+    img.save(buf, format='JPEG', quality=quality, optimize=True)
+    result = buf.getvalue()
+    if mozjpeg_lossless_optimization is not None:
+        try:
+            result = mozjpeg_lossless_optimization.optimize(result)
+        except ValueError:
+            pass  # 优化失败时保留 Pillow 输出
+    return result
+
+
+def resize_candidate(img, img_bytes, scale, is_jpeg):
+    """生成 scale 档位的候选图像。
+
+    JPEG 源优先用 draft() 在解码阶段做 DCT 域 1/2、1/4、1/8 降采样，
+    比「全量解码 + LANCZOS」便宜得多；draft 只能落到最近的 1/n，
+    差距部分再用 LANCZOS 收尾到精确尺寸。
+    """
+    w, h = img.size
+    new_w, new_h = int(w * scale), int(h * scale)
+    if scale >= 1.0:
+        return img
+    if is_jpeg:
+        candidate = Image.open(io.BytesIO(img_bytes))
+        candidate.draft('RGB', (new_w, new_h))
+        if candidate.size != (new_w, new_h):
+            candidate = candidate.resize((new_w, new_h), Image.LANCZOS, reducing_gap=2.0)
+        if candidate.mode != 'RGB':
+            candidate = candidate.convert('RGB')
+        return candidate
+    # reducing_gap: 先整数倍 box 降采样到 2 倍目标尺寸内，再 LANCZOS 收尾，
+    # 大幅缩小卷积输入，压缩场景下质量差异可忽略
+    return img.resize((new_w, new_h), Image.LANCZOS, reducing_gap=2.0)
+
+
 def compress_image(img_bytes, media_type, target_bytes):
     """压缩单张图片到目标大小"""
     img = Image.open(io.BytesIO(img_bytes))
+    is_jpeg = img.format == 'JPEG'
 
     # RGBA 转 RGB（JPEG 不支持 alpha）
     if img.mode in ('RGBA', 'P'):
         img = img.convert('RGB')
         media_type = 'image/jpeg'
 
-    # 逐步压缩：先降质量，再缩尺寸
-    for scale in [1.0, 0.75, 0.5, 0.35, 0.25]:
-        w, h = img.size
-        new_w, new_h = int(w * scale), int(h * scale)
-        if new_w < 100 or new_h < 100:
+    # 展开 (scale, quality) 网格，按预估输出大小从大到小排序。
+    # 输出大小随 scale/quality 单调，可二分找到满足目标的最高档位：
+    # O(log n) 次编码代替最多 20 次的线性扫描
+    w, h = img.size
+    candidates = [
+        (scale, quality)
+        for scale in SCALE_STEPS
+        for quality in QUALITY_STEPS
+        if int(w * scale) >= 100 and int(h * scale) >= 100
+    ]
+    candidates.sort(key=lambda c: estimate_size(w, h, c[0], c[1]), reverse=True)
+
+    best = None
+    lo, hi = 0, len(candidates) - 1
+    buf = io.BytesIO()  # 编码缓冲区，所有尝试共用
+    resized_cache = {}  # scale -> Image，同一尺寸的多个 quality 档共用一次重采样
+    calib = None  # 实际/预估 大小比值，用本图的真实编码结果在线校准
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        scale, quality = candidates[mid]
+        est = estimate_size(w, h, scale, quality)
+        if calib is not None and est * calib > 3 * target_bytes:
+            # 校准后的预估远超目标，这次编码注定失败，直接当超标处理
+            # （3 倍余量，预估偏差不至于误杀可行档位）
+            lo = mid + 1
             continue
-        resized = img.resize((new_w, new_h), Image.LANCZOS) if scale < 1.0 else img
+        if scale not in resized_cache:
+            resized_cache[scale] = resize_candidate(img, img_bytes, scale, is_jpeg)
+        resized = resized_cache[scale]
+        result = encode_jpeg(resized, quality, buf)
+        calib = len(result) / est
+        if len(result) <= target_bytes:
+            best = result  # 合规，尝试更高档位
+            hi = mid - 1
+        else:
+            lo = mid + 1
 
-        for quality in [85, 60, 40, 25]:
-            buf = io.BytesIO()
-            resized.save(buf, format='JPEG', quality=quality, optimize=True)
-            result = buf.getvalue()
-            if len(result) <= target_bytes:
-                return base64.b64encode(result).decode('ascii'), 'image/jpeg'
+    if best is not None:
+        return b64_str(best), 'image/jpeg'
 
     # 最后兜底：强制缩到很小
-    resized = img.resize((400, int(400 * img.size[1] / img.size[0])), Image.LANCZOS)
-    buf = io.BytesIO()
-    resized.save(buf, format='JPEG', quality=20, optimize=True)
-    return base64.b64encode(buf.getvalue()).decode('ascii'), 'image/jpeg'
+    resized = img.resize(
+        (400, int(400 * img.size[1] / img.size[0])), Image.LANCZOS, reducing_gap=2.0
+    )
+    return b64_str(encode_jpeg(resized, 20, buf)), 'image/jpeg'
+
+
+def compress_b64(b64_data, media_type, target_bytes):
+    """接收 base64 str 的压缩入口，解码推迟到任务内部（进程池中并行执行）"""
+    return compress_image(binascii.a2b_base64(b64_data), media_type, target_bytes)
 
 
 def main():
-    data = json.loads(sys.stdin.read())
+    # 直接从二进制流解析，省掉文本层的整段 str 拷贝（载荷可达 8MB）
+    data = load_json(sys.stdin.buffer.read())
     images = data['images']
     max_total = data.get('max_total_bytes', 8000000)
 
@@ -49,7 +170,7 @@ def main():
 
     if total <= max_total:
         # 不需要压缩
-        json.dump({"images": images}, sys.stdout)
+        dump_json({"images": images})
         return
 
     # 每张图的目标大小（均分，留 10% 余量）
@@ -57,17 +178,37 @@ def main():
     # 对应的原始字节数（base64 膨胀约 33%）
     per_image_target_bytes = int(per_image_target_b64 * 3 / 4)
 
-    result = []
-    for img in images:
-        b64_data = img['data']
-        if len(b64_data) <= per_image_target_b64:
-            result.append(img)
+    # 先分组：小图原样保留（不做任何解码/重编码），超标的才进压缩流程。
+    # base64 解码推迟到 compress_b64 内部，主循环完全不碰载荷字节
+    result = [None] * len(images)
+    jobs = []  # (下标, base64 str, media_type)
+    for i, img in enumerate(images):
+        if len(img['data']) <= per_image_target_b64:
+            result[i] = img
         else:
-            raw = base64.b64decode(b64_data)
-            new_b64, new_type = compress_image(raw, img['media_type'], per_image_target_bytes)
-            result.append({"data": new_b64, "media_type": new_type})
+            jobs.append((i, img['data'], img['media_type']))
+
+    if len(jobs) <= 1:
+        # 单张图不值得起进程池
+        for i, b64_data, media_type in jobs:
+            new_b64, new_type = compress_b64(b64_data, media_type, per_image_target_bytes)
+            result[i] = {"data": new_b64, "media_type": new_type}
+    else:
+        # 每张图一个任务，近线性加速到 min(N, 核数)
+        ctx = mp.get_context('forkserver') if sys.platform.startswith('linux') else None
+        with ProcessPoolExecutor(
+            max_workers=min(len(jobs), os.cpu_count() or 1), mp_context=ctx
+        ) as executor:
+            outputs = executor.map(
+                compress_b64,
+                [j[1] for j in jobs],
+                [j[2] for j in jobs],
+                [per_image_target_bytes] * len(jobs),
+            )
+            for (i, _, _), (new_b64, new_type) in zip(jobs, outputs):
+                result[i] = {"data": new_b64, "media_type": new_type}
 
-    json.dump({"images": result}, sys.stdout)
+    dump_json({"images": result})
 
 
 if __name__ == '__main__':
@@ -18,8 +18,10 @@ Input JSON format:
 import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import mm, cm
 from reportlab.lib.colors import HexColor
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
@@ -30,6 +32,32 @@ from reportlab.platypus import (
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
+# Optional: SIMD JSON parsing/serialization for large section payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_json_stdin():
+    """Parse the JSON request from stdin."""
+    raw = sys.stdin.buffer.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def emit(obj):
+    """Write one JSON result line to stdout."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(obj))
+
+
+# Each PDF generation spawns a fresh process; memoize the winning font path
+# here so repeat invocations skip the candidate scan.
+FONT_PATH_CACHE = os.path.expanduser("~/.cache/generate_pdf_font_path")
+
 
 def register_chinese_font():
     """Register a Chinese-capable font. Try common system paths."""
@@ -48,13 +76,29 @@ def register_chinese_font():
         "/System/Library/Fonts/STHeiti Light.ttc",
         "/System/Library/Fonts/Hiragino Sans GB.ttc",
     ]
+    cached = None
+    try:
+        with open(FONT_PATH_CACHE) as f:
+            cached = f.read().strip()
+    except OSError:
+        pass
+    if cached and os.path.exists(cached):
+        candidates = [cached] + [fp for fp in candidates if fp != cached]
+
     for fp in candidates:
         if os.path.exists(fp):
             try:
                 pdfmetrics.registerFont(TTFont("ChineseFont", fp))
-                return "ChineseFont"
             except Exception:
                 continue
+            if fp != cached:
+                try:
+                    os.makedirs(os.path.dirname(FONT_PATH_CACHE), exist_ok=True)
+                    with open(FONT_PATH_CACHE, "w") as f:
+                        f.write(fp)
+                except OSError:
+                    pass  # cache is best-effort
+            return "ChineseFont"
     # Fallback: use Helvetica (Chinese chars will fail, but at least pure-ASCII works)
     return "Helvetica"
 
@@ -69,55 +113,73 @@ BORDER_COLOR = HexColor("#D9D9D9")
 WHITE = HexColor("#FFFFFF")
 
 
+# Table styles are identical for every table, so compile them once instead of
+# rebuilding the command list per table. ROWBACKGROUNDS cycles [None, LIGHT_BG]
+# from the first data row, replacing one BACKGROUND command per striped row.
+_BASE_TABLE_CMDS = [
+    ("GRID", (0, 0), (-1, -1), 0.5, BORDER_COLOR),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+]
+PLAIN_TABLE_STYLE = TableStyle(_BASE_TABLE_CMDS)
+HEADER_TABLE_STYLE = TableStyle(_BASE_TABLE_CMDS + [
+    ("BACKGROUND", (0, 0), (-1, 0), ACCENT),
+    ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [None, LIGHT_BG]),
+])
+
+
+@lru_cache(maxsize=1)
 def make_styles():
-    """Create custom paragraph styles."""
-    base = getSampleStyleSheet()
+    """Create custom paragraph styles.
+
+    A single minimal base style stands in for getSampleStyleSheet(): the
+    sample sheet builds ~20 styles whose every inherited field we override
+    anyway. Memoized so repeat calls reuse the same dict.
+    """
+    base = ParagraphStyle(
+        "Base", fontName=CJK_FONT, fontSize=11, leading=16, textColor=PRIMARY,
+    )
     styles = {}
     styles["title"] = ParagraphStyle(
-        "CustomTitle", parent=base["Title"],
-        fontName=CJK_FONT,
-        fontSize=26, leading=32, textColor=PRIMARY,
+        "CustomTitle", parent=base,
+        fontSize=26, leading=32,
         alignment=TA_CENTER, spaceAfter=6 * mm,
     )
     styles["subtitle"] = ParagraphStyle(
-        "CustomSubtitle", parent=base["Normal"],
-        fontName=CJK_FONT,
+        "CustomSubtitle", parent=base,
         fontSize=14, leading=18, textColor=HexColor("#666666"),
         alignment=TA_CENTER, spaceAfter=20 * mm,
     )
     styles["h1"] = ParagraphStyle(
-        "H1", parent=base["Heading1"],
-        fontName=CJK_FONT,
+        "H1", parent=base,
         fontSize=20, leading=26, textColor=ACCENT,
         spaceBefore=8 * mm, spaceAfter=4 * mm,
     )
     styles["h2"] = ParagraphStyle(
-        "H2", parent=base["Heading2"],
-        fontName=CJK_FONT,
-        fontSize=16, leading=22, textColor=PRIMARY,
+        "H2", parent=base,
+        fontSize=16, leading=22,
         spaceBefore=6 * mm, spaceAfter=3 * mm,
     )
     styles["h3"] = ParagraphStyle(
-        "H3", parent=base["Heading3"],
-        fontName=CJK_FONT,
+        "H3", parent=base,
         fontSize=13, leading=18, textColor=HexColor("#444444"),
         spaceBefore=4 * mm, spaceAfter=2 * mm,
     )
     styles["body"] = ParagraphStyle(
-        "Body", parent=base["Normal"],
-        fontName=CJK_FONT,
-        fontSize=11, leading=16, textColor=PRIMARY,
+        "Body", parent=base,
         alignment=TA_JUSTIFY, spaceAfter=3 * mm,
     )
     styles["table_header"] = ParagraphStyle(
-        "TableHeader", parent=base["Normal"],
-        fontName=CJK_FONT,
+        "TableHeader", parent=base,
         fontSize=10, leading=14, textColor=WHITE,
     )
     styles["table_cell"] = ParagraphStyle(
-        "TableCell", parent=base["Normal"],
-        fontName=CJK_FONT,
-        fontSize=10, leading=14, textColor=PRIMARY,
+        "TableCell", parent=base,
+        fontSize=10, leading=14,
     )
     return styles
 
@@ -160,25 +222,7 @@ def build_table(section, styles):
     col_width = avail_width / num_cols
 
     t = Table(table_data, colWidths=[col_width] * num_cols)
-    style_cmds = [
-        ("GRID", (0, 0), (-1, -1), 0.5, BORDER_COLOR),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-    ]
-    if headers:
-        style_cmds.extend([
-            ("BACKGROUND", (0, 0), (-1, 0), ACCENT),
-            ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
-        ])
-        # Alternate row colors
-        for i in range(1, len(table_data)):
-            if i % 2 == 0:
-                style_cmds.append(("BACKGROUND", (0, i), (-1, i), LIGHT_BG))
-
-    t.setStyle(TableStyle(style_cmds))
+    t.setStyle(HEADER_TABLE_STYLE if headers else PLAIN_TABLE_STYLE)
     return t
 
 
@@ -197,8 +241,44 @@ def build_list(section, styles):
     return ListFlowable(items, bulletType=bullet_type, start=1 if ordered else None)
 
 
+HEADING_MAP = {1: "h1", 2: "h2", 3: "h3"}
+
+
+def build_chunk(secs, styles):
+    """Build the flowables for one run of sections (no pagebreaks inside)."""
+    flow = []
+    for sec in secs:
+        sec_type = sec.get("type", "paragraph")
+
+        if sec_type == "heading":
+            level = sec.get("level", 1)
+            style_key = HEADING_MAP.get(level, "h3")
+            flow.append(Paragraph(sec.get("content", ""), styles[style_key]))
+
+        elif sec_type == "paragraph":
+            text = sec.get("content", "")
+            for para in text.split("\n\n"):
+                para = para.strip()
+                if para:
+                    flow.append(Paragraph(para, styles["body"]))
+
+        elif sec_type == "table":
+            t = build_table(sec, styles)
+            if t:
+                flow.append(Spacer(1, 3 * mm))
+                flow.append(t)
+                flow.append(Spacer(1, 3 * mm))
+
+        elif sec_type == "list":
+            lst = build_list(sec, styles)
+            flow.append(lst)
+            flow.append(Spacer(1, 2 * mm))
+
+    return flow
+
+
 def main():
-    data = json.load(sys.stdin)
+    data = load_json_stdin()
     output_path = data["outputPath"]
     title = data.get("title", "Document")
     author = data.get("author", "")
@@ -226,48 +306,37 @@ def main():
     story.append(line_table)
     story.append(Spacer(1, 20 * mm))
 
-    heading_map = {1: "h1", 2: "h2", 3: "h3"}
-
+    # Runs of sections between pagebreaks are independent, so flowable
+    # construction (markup parse + font shaping) is fanned out to threads;
+    # the runs are stitched back in order with PageBreak()s.
+    chunks = [[]]
     for sec in sections:
-        sec_type = sec.get("type", "paragraph")
-
-        if sec_type == "heading":
-            level = sec.get("level", 1)
-            style_key = heading_map.get(level, "h3")
-            story.append(Paragraph(sec.get("content", ""), styles[style_key]))
-
-        elif sec_type == "paragraph":
-            text = sec.get("content", "")
-            for para in text.split("\n\n"):
-                para = para.strip()
-                if para:
-                    story.append(Paragraph(para, styles["body"]))
-
-        elif sec_type == "table":
-            t = build_table(sec, styles)
-            if t:
-                story.append(Spacer(1, 3 * mm))
-                story.append(t)
-                story.append(Spacer(1, 3 * mm))
-
-        elif sec_type == "list":
-            lst = build_list(sec, styles)
-            story.append(lst)
-            story.append(Spacer(1, 2 * mm))
-
-        elif sec_type == "pagebreak":
+        if sec.get("type") == "pagebreak":
+            chunks.append([])
+        else:
+            chunks[-1].append(sec)
+
+    if len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(4, len(chunks))) as executor:
+            built = list(executor.map(lambda secs: build_chunk(secs, styles), chunks))
+    else:
+        built = [build_chunk(chunks[0], styles)]
+
+    for i, flow in enumerate(built):
+        if i:
             story.append(PageBreak())
+        story.extend(flow)
 
     def on_page(canvas, doc_obj):
         header_footer(canvas, doc_obj, title, author)
 
     doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
-    print(json.dumps({"success": True, "path": output_path}))
+    emit({"success": True, "path": output_path})
 
 
 if __name__ == "__main__":
     try:
         main()
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        emit({"error": str(e)})
         sys.exit(1)
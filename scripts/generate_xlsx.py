@@ -17,74 +17,138 @@ Input JSON format:
 }
 """
 import json
+import re
 import sys
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+import xlsxwriter
+
+# Optional: vectorizes the auto-width reduction on large sheets
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional: SIMD JSON parsing/serialization for large sheet payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_json_stdin():
+    """Parse the JSON request from stdin."""
+    raw = sys.stdin.buffer.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def emit(obj):
+    """Write one JSON result line to stdout."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(obj))
+
+
+def max_cell_lengths(headers, rows):
+    """Max rendered length per header column, in one pass over the rows."""
+    n_cols = len(headers)
+    max_lens = [len(str(h)) for h in headers]
+    if np is not None and rows and all(len(r) == n_cols for r in rows):
+        # Rectangular data: one C-level str_len + max reduction per sheet
+        # instead of a Python len(str(...)) per cell
+        arr = np.array(rows, dtype=object)
+        arr = np.where(arr == None, "", arr)  # noqa: E711 — elementwise None test
+        col_lens = np.char.str_len(arr.astype("U")).max(axis=0)
+        return [max(m, int(l)) for m, l in zip(max_lens, col_lens)]
+    for row in rows:
+        for col_idx, val in enumerate(row[:n_cols]):
+            if val is not None:
+                cell_len = len(str(val))
+                if cell_len > max_lens[col_idx]:
+                    max_lens[col_idx] = cell_len
+    return max_lens
 
 
 def auto_width(ws, headers, rows, explicit_widths):
     """Set column widths: use explicit if provided, otherwise auto-fit."""
-    for col_idx in range(1, len(headers) + 1):
-        if explicit_widths and col_idx - 1 < len(explicit_widths) and explicit_widths[col_idx - 1]:
-            ws.column_dimensions[get_column_letter(col_idx)].width = explicit_widths[col_idx - 1]
+    max_lens = max_cell_lengths(headers, rows)
+    for col_idx in range(len(headers)):
+        if explicit_widths and col_idx < len(explicit_widths) and explicit_widths[col_idx]:
+            ws.set_column(col_idx, col_idx, explicit_widths[col_idx])
         else:
-            max_len = len(str(headers[col_idx - 1])) if col_idx - 1 < len(headers) else 8
-            for row in rows:
-                if col_idx - 1 < len(row):
-                    cell_len = len(str(row[col_idx - 1])) if row[col_idx - 1] is not None else 0
-                    max_len = max(max_len, cell_len)
-            ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 4, 60)
+            ws.set_column(col_idx, col_idx, min(max_lens[col_idx] + 4, 60))
+
+
+def unique_sheet_name(name, used):
+    """Dedupe sheet names the way openpyxl did: case-insensitive, numeric suffix.
+
+    xlsxwriter raises on duplicates where openpyxl silently renamed
+    (Sheet, Sheet1, ...), and sheet names come from model-generated input.
+    """
+    base = name
+    counter = 0
+    while name.lower() in used:
+        counter += 1
+        suffix = str(counter)
+        name = base[:31 - len(suffix)] + suffix  # keep Excel's 31 char limit
+    used.add(name.lower())
+    return name
+
+
+def make_formats(wb):
+    """Create the shared cell formats once per workbook."""
+    border = {"border": 1, "border_color": "#D9D9D9"}
+    return {
+        "header": wb.add_format({
+            "bold": True, "font_color": "#FFFFFF", "font_size": 11,
+            "bg_color": "#4472C4", "align": "center", "valign": "vcenter",
+            "text_wrap": True, **border,
+        }),
+        "body": wb.add_format({"valign": "vcenter", "text_wrap": True, **border}),
+        "alt": wb.add_format({
+            "valign": "vcenter", "text_wrap": True,
+            "bg_color": "#F2F7FB", **border,
+        }),
+    }
 
 
-def build_sheet(ws, sheet_data):
+def build_sheet(ws, sheet_data, formats):
     """Populate a worksheet from sheet data dict."""
     headers = sheet_data.get("headers", [])
     rows = sheet_data.get("rows", [])
     col_widths = sheet_data.get("columnWidths")
     formulas = sheet_data.get("formulas", [])
 
-    # Style definitions
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    thin_border = Border(
-        left=Side(style="thin", color="D9D9D9"),
-        right=Side(style="thin", color="D9D9D9"),
-        top=Side(style="thin", color="D9D9D9"),
-        bottom=Side(style="thin", color="D9D9D9"),
-    )
-    alt_fill = PatternFill(start_color="F2F7FB", end_color="F2F7FB", fill_type="solid")
-
-    # Write headers
-    for col_idx, h in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_idx, value=h)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_align
-        cell.border = thin_border
-
-    # Write data rows
-    for row_idx, row_data in enumerate(rows, 2):
-        for col_idx, val in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=coerce_value(val))
-            cell.border = thin_border
-            cell.alignment = Alignment(vertical="center", wrap_text=True)
-            if row_idx % 2 == 0:
-                cell.fill = alt_fill
+    # Column widths first: in constant_memory mode rows are streamed out
+    # as they are written
+    auto_width(ws, headers, rows, col_widths)
+
+    if headers:
+        ws.write_row(0, 0, headers, formats["header"])
+
+    # Data rows; alternate fill on even spreadsheet rows
+    for row_idx, row_data in enumerate(rows, 1):
+        fmt = formats["alt"] if row_idx % 2 == 1 else formats["body"]
+        ws.write_row(row_idx, 0, [coerce_value(val) for val in row_data], fmt)
 
     # Apply formulas
     for f in formulas:
         cell_ref = f.get("cell", "")
         formula_str = f.get("formula", "")
         if cell_ref and formula_str:
-            ws[cell_ref] = formula_str
+            # Uppercase the ref like openpyxl's ws["b1"] did — xlsxwriter
+            # rejects lowercase refs with only a warning, silently dropping
+            # the formula
+            ws.write_formula(cell_ref.upper(), formula_str)
 
     # Freeze top row
-    ws.freeze_panes = "A2"
+    ws.freeze_panes(1, 0)
 
-    # Auto-width
-    auto_width(ws, headers, rows, col_widths)
+
+# Matches plain integers, decimals and percentages; one DFA match replaces
+# the former float()/int() try/except cascade, which raised and caught a
+# ValueError for every non-numeric cell
+_NUM_RE = re.compile(r"[+-]?\d+(\.\d+)?(%)?")
 
 
 def coerce_value(val):
@@ -97,47 +161,45 @@ def coerce_value(val):
         s = val.strip()
         if not s:
             return s
-        # Percentage
-        if s.endswith("%"):
-            try:
+        m = _NUM_RE.fullmatch(s)
+        if m:
+            if m.group(2):  # percentage
                 return float(s[:-1]) / 100
-            except ValueError:
-                pass
-        # Number
-        try:
-            if "." in s:
+            if m.group(1):  # has a decimal part
                 return float(s)
             return int(s)
-        except ValueError:
-            pass
     return val
 
 
 def main():
-    data = json.load(sys.stdin)
+    data = load_json_stdin()
     output_path = data["outputPath"]
     sheets = data.get("sheets", [])
 
     if not sheets:
-        print(json.dumps({"error": "No sheets provided"}))
+        emit({"error": "No sheets provided"})
         sys.exit(1)
 
-    wb = Workbook()
-    # Remove default sheet
-    wb.remove(wb.active)
+    # constant_memory streams rows straight into the zip archive, but then
+    # already-written rows cannot be revisited — only safe without formulas
+    # (which may target arbitrary cells)
+    has_formulas = any(s.get("formulas") for s in sheets)
+    wb = xlsxwriter.Workbook(output_path, {"constant_memory": not has_formulas})
+    formats = make_formats(wb)
 
+    used_names = set()
     for sheet_data in sheets:
         name = sheet_data.get("name", "Sheet")[:31]  # Excel 31 char limit
-        ws = wb.create_sheet(title=name)
-        build_sheet(ws, sheet_data)
+        ws = wb.add_worksheet(unique_sheet_name(name, used_names))
+        build_sheet(ws, sheet_data, formats)
 
-    wb.save(output_path)
-    print(json.dumps({"success": True, "path": output_path}))
+    wb.close()
+    emit({"success": True, "path": output_path})
 
 
 if __name__ == "__main__":
     try:
         main()
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        emit({"error": str(e)})
         sys.exit(1)